@@ -4,7 +4,8 @@ instagram_followees_scraper_v3.py
 Enhanced version with aggressive modal scrolling and better Instagram handling
 
 Requirements:
-  pip install selenium webdriver-manager pandas
+  pip install selenium webdriver-manager
+  Optional: playwright (BACKEND = "playwright"), lxml (FakeBackend), aiohttp (ENRICH_BIO_LINKS), pandas (bench-memory)
 
 Key improvements:
   - Aggressive modal scrolling with multiple strategies
@@ -18,8 +19,17 @@ import csv
 import re
 import os
 import json
+import sys
+import asyncio
+import threading
+import shutil
+import sqlite3
+import gzip
+from array import array
 from pathlib import Path
 from typing import List, Dict, Optional
+from abc import ABC, abstractmethod
+from urllib.parse import urljoin
 
 import platform
 
@@ -35,7 +45,6 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.common.action_chains import ActionChains
 from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
 
 # --------- CONFIG ----------
 INSTAGRAM_USERNAME = "your_username"
@@ -43,6 +52,9 @@ INSTAGRAM_PASSWORD = "your_passwordd"
 TARGET_ACCOUNT = "ashneer.grover"
 OUTPUT_CSV = f"{TARGET_ACCOUNT}_followees_detailed.csv"
 CHECKPOINT_FILE = f"{TARGET_ACCOUNT}_checkpoint.json"
+ACCOUNT_STATE_FILE = "account_state.json"  # Cool-down deadlines per Instagram account
+ACCOUNT_COOLDOWN_MINUTES = 60  # How long to leave an account alone after Instagram challenges it
+USERNAMES_JOURNAL = f"{TARGET_ACCOUNT}_usernames.partial"
 
 HEADLESS = False  # Set to False for debugging modal issues
 BATCH_SIZE = 25
@@ -50,13 +62,66 @@ DELAY_RANGE = (3.0, 6.0)
 SCROLL_PAUSE = 2.0  # Increased - time between scrolls (try 3.0 if still having issues)
 MAX_FOLLOWEES_TO_COLLECT = None  # Set to a number like 50 for testing
 SAVE_FREQUENCY = 10
+PIPELINE_TABS = 1  # >1 keeps profiles loading ahead in extra tabs; only helps if load + extraction outlasts NAV_INTERVAL
+BACKEND = "selenium"  # "selenium" or "playwright" (pip install playwright && playwright install chromium)
+PROFILE_DIR = None  # e.g. "chrome_profiles" to keep a warm Chrome profile + disk cache between runs (selenium only)
+DISK_CACHE_MB = 512
+ARCHIVE_DIR = None  # e.g. "page_archive" to keep gzipped HTML of every fetched page for `reparse`
+ENRICH_BIO_LINKS = False  # Fetch bio links in the background for extra emails/handles (pip install aiohttp)
+ENRICH_OUTPUT_CSV = f"{TARGET_ACCOUNT}_followees_enriched.csv"
+
+# Graph crawl (python scrapper.py crawl): expand followees of followees
+CRAWL_DEPTH = 2  # 1 = TARGET_ACCOUNT's followees, 2 = their followees too, ...
+CRAWL_MAX_PAGE_LOADS = 2000  # Total budget across resumed runs
+CRAWL_DB = f"{TARGET_ACCOUNT}_crawl.sqlite"
+CRAWL_EDGES = f"{TARGET_ACCOUNT}_crawl_edges.bin"
+CRAWL_OUTPUT_CSV = f"{TARGET_ACCOUNT}_crawl_profiles.csv"
+SNAPSHOT_DB = None  # e.g. "snapshots.sqlite" to keep every run's observations for history queries
+
+# Pacing: minimum random gap between the starts of two page navigations
+# (what the old post-load sleep plus DELAY_RANGE used to add up to)
+NAV_INTERVAL = (DELAY_RANGE[0] + 3.0, DELAY_RANGE[1] + 5.0)
+
+# Readiness waits: each step returns as soon as its data is on the page,
+# or gives up after its own budget (seconds)
+WAIT_BUDGETS = {
+    "cookie_banner": 5,
+    "login_form": 15,
+    "login_result": 15,
+    "dismiss_dialog": 8,
+    "profile": 15,
+    "following_link": 10,
+    "modal": 15,
+    "modal_rows": 10,
+    "challenge": 300,  # Time to finish a verification by hand in the browser window
+}
+# The rendered header, not the og:description meta: the meta is in the first
+# response and would pass before name, bio, verified and links exist
+PROFILE_READY = "//header[.//ul/li or .//a[contains(@href, '/followers')]]"
+PROFILE_META = "//meta[@property='og:description' and contains(@content, 'Followers')]"
+
+# Bio link enrichment
+ENRICH_CACHE_FILE = "bio_link_cache.json"
+ENRICH_CACHE_DAYS = 7
+ENRICH_CONCURRENCY = 20
+ENRICH_PER_HOST = 2
+ENRICH_TIMEOUT = 15
+ENRICH_MAX_BYTES = 2_000_000
+
+# Signs that Instagram is challenging or limiting the logged-in account
+CHALLENGE_URL_PARTS = ("/challenge", "/accounts/suspended", "/accounts/disabled", "/auth_platform")
+CHALLENGE_XPATH = ("//*[contains(text(), 'Try Again Later') or contains(text(), 'We restrict certain activity')"
+                   " or contains(text(), 'Confirm it') or contains(text(), 'Help us confirm')]")
 
 # Advanced scrolling settings
 SCROLL_MAX_NO_CHANGE = 25  # How many scroll attempts with no new usernames before stopping
 SCROLL_PATIENCE_MULTIPLIER = 1.5  # Increase this to 2.0 or 3.0 for even more patience
+FAST_FORWARD_PAUSE = 0.4  # Pause between scrolls while a resumed run skips rows it already has
 
 # Patterns
 EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+RESERVED_INSTAGRAM_PATHS = ['explore', 'p', 'reel', 'reels', 'tv', 'stories',
+                           'direct', 'accounts', 'about', 'legal', 'help']
 URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
 
 # ---------- HELPER FUNCTIONS ----------
@@ -67,6 +132,39 @@ def rand_sleep(a=None, b=None):
     t = random.uniform(a, b)
     time.sleep(t)
 
+class PacingPolicy:
+    """
+    Human-like spacing between navigations, independent of how fast pages
+    load: before_navigation() sleeps until a random `interval` has passed
+    since the previous navigation started.
+    """
+
+    def __init__(self, interval=NAV_INTERVAL):
+        self.interval = interval
+        self.last = None
+
+    def before_navigation(self):
+        if self.last is not None:
+            wait = self.last + random.uniform(*self.interval) - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        self.last = time.monotonic()
+
+PACING = PacingPolicy()
+
+def wait_ready(browser, step, xpath, clickable=False):
+    """Wait for `xpath` within the WAIT_BUDGETS[step] timeout and return the element."""
+    return browser.wait_for(xpath, WAIT_BUDGETS[step], clickable=clickable)
+
+def wait_until(condition, step, poll=0.25):
+    """Poll condition() until it is truthy or WAIT_BUDGETS[step] runs out; returns its last value."""
+    deadline = time.monotonic() + WAIT_BUDGETS[step]
+    while True:
+        result = condition()
+        if result or time.monotonic() >= deadline:
+            return result
+        time.sleep(poll)
+
 def save_checkpoint(usernames: List[str], processed: List[str]):
     checkpoint = {
         "usernames": usernames,
@@ -83,6 +181,73 @@ def load_checkpoint() -> Optional[Dict]:
             return json.load(f)
     return None
 
+class UsernameJournal:
+    """
+    Usernames collected from a modal, appended to disk one line at a time while
+    scrolling, so Chrome crashing or Ctrl-C loses nothing. `recovered` holds
+    what an interrupted run left behind; finish() removes the journal.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.recovered = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.recovered = list(dict.fromkeys(line.strip() for line in f if line.strip()))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, username):
+        self._file.write(username + "\n")
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def finish(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class AccountChallenged(Exception):
+    """Instagram showed a challenge or rate-limit page to the logged-in account."""
+
+class AccountStats:
+    """Per-account counters for the run report."""
+
+    def __init__(self, account):
+        self.account = account
+        self.started = time.monotonic()
+        self.profiles = 0
+        self.challenged = False
+
+    def start(self):
+        """Restart the clock when profile scraping begins, so login and modal time don't dilute the rate."""
+        self.started = time.monotonic()
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.profiles / max(elapsed / 3600, 1e-9)
+        status = " - stopped by an Instagram challenge" if self.challenged else ""
+        print(f"  {self.account}: {self.profiles} profiles in {elapsed / 60:.1f} min ({rate:.0f}/hour){status}")
+
+def _load_account_state():
+    if os.path.exists(ACCOUNT_STATE_FILE):
+        with open(ACCOUNT_STATE_FILE) as f:
+            return json.load(f)
+    return {}
+
+def start_cooldown(account):
+    state = _load_account_state()
+    state[account] = {"cooldown_until": time.time() + ACCOUNT_COOLDOWN_MINUTES * 60}
+    with open(ACCOUNT_STATE_FILE, 'w') as f:
+        json.dump(state, f)
+
+def cooldown_remaining(account):
+    """Seconds until `account` may be used again (0 when it is not cooling down)."""
+    until = _load_account_state().get(account, {}).get("cooldown_until", 0)
+    return max(until - time.time(), 0)
+
 def _find_browser():
     """
     Scan known OS-specific paths for Google Chrome and Chromium.
@@ -116,7 +281,130 @@ def _find_browser():
     return None, False
 
 
-def start_driver(headless=HEADLESS):
+def _user_agent():
+    # Match user-agent to the actual OS so Instagram renders the expected layout
+    if platform.system() == "Darwin":
+        return ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/120.0.0.0 Safari/537.36")
+    return ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+            "AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/120.0.0.0 Safari/537.36")
+
+
+class ChromeProfile:
+    """
+    A persistent user-data-dir under PROFILE_DIR, locked for one worker at a
+    time. The OS drops the lock if the process dies, so a crashed run never
+    leaves the directory blocked. `warm` tells whether the disk cache was
+    already populated when the profile was acquired.
+    """
+
+    LOCK_NAME = "scraper.lock"
+    CACHE_NAME = "cache"
+
+    def __init__(self, path):
+        self.path = Path(path).resolve()
+        self.cache_dir = self.path / self.CACHE_NAME
+        self.warm = False
+        self._lock = None
+
+    @classmethod
+    def acquire_free(cls, root=None, max_workers=16):
+        """Lock the first unused worker-<n> directory under `root`."""
+        root = Path(root or PROFILE_DIR)
+        for worker_id in range(max_workers):
+            profile = cls(root / f"worker-{worker_id}")
+            if profile.acquire():
+                return profile
+        raise RuntimeError(f"All {max_workers} Chrome profiles under {root} are in use")
+
+    def acquire(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        handle = open(self.path / self.LOCK_NAME, "a+")
+        try:
+            if platform.system() == "Windows":
+                import msvcrt
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._lock = handle
+
+        if self._is_corrupted():
+            print(f"  ⚠️  Chrome profile {self.path} is corrupted - starting it fresh")
+            self._wipe()
+
+        # A Chrome that crashed leaves these behind and refuses to reuse the profile
+        for name in ("SingletonLock", "SingletonSocket", "SingletonCookie"):
+            leftover = self.path / name
+            if leftover.is_symlink() or leftover.exists():
+                leftover.unlink()
+
+        self.warm = self.cache_dir.is_dir() and any(self.cache_dir.iterdir())
+        return True
+
+    def release(self):
+        if self._lock:
+            self._lock.close()
+            self._lock = None
+
+    def _is_corrupted(self):
+        for state_file in (self.path / "Local State", self.path / "Default" / "Preferences"):
+            if state_file.exists():
+                try:
+                    with open(state_file, encoding="utf-8") as f:
+                        json.load(f)
+                except (ValueError, OSError):
+                    return True
+        return False
+
+    def _wipe(self):
+        for child in self.path.iterdir():
+            if child.name == self.LOCK_NAME:
+                continue
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                child.unlink()
+
+
+def report_first_load(browser):
+    """Log this run's first page load under PROFILE_DIR and print cold vs warm averages."""
+    profile = getattr(browser, "profile", None)
+    seconds = getattr(browser, "first_load", None)
+    if profile is None or seconds is None:
+        return
+
+    log_path = profile.path.parent / "first_loads.jsonl"
+    with open(log_path, "a") as f:
+        f.write(json.dumps({
+            "profile": profile.path.name,
+            "warm": profile.warm,
+            "seconds": round(seconds, 3),
+            "timestamp": time.time()
+        }) + "\n")
+
+    samples = {True: [], False: []}
+    with open(log_path) as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                samples[bool(entry["warm"])].append(entry["seconds"])
+            except (ValueError, KeyError):
+                continue
+
+    print(f"⏱  First page load: {seconds:.2f}s ({'warm' if profile.warm else 'cold'} profile)")
+    for warm, label in ((False, "cold"), (True, "warm")):
+        if samples[warm]:
+            avg = sum(samples[warm]) / len(samples[warm])
+            print(f"    {label}: {avg:.2f}s average over {len(samples[warm])} run(s)")
+
+
+def start_driver(headless=HEADLESS, profile=None):
     print("Starting driver...")
     IS_MAC = platform.system() == "Darwin"
     IS_LINUX = platform.system() == "Linux"
@@ -148,16 +436,13 @@ def start_driver(headless=HEADLESS):
     options.add_argument("--lang=en-US")
     options.add_argument("--window-size=1920,1080")
 
-    # Match user-agent to the actual OS so Instagram renders the expected layout
-    if IS_MAC:
-        user_agent = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/120.0.0.0 Safari/537.36")
-    else:
-        user_agent = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                      "AppleWebKit/537.36 (KHTML, like Gecko) "
-                      "Chrome/120.0.0.0 Safari/537.36")
-    options.add_argument(f"user-agent={user_agent}")
+    options.add_argument(f"user-agent={_user_agent()}")
+
+    if profile:
+        print(f"  Profile: {profile.path} ({'warm' if profile.warm else 'cold'})")
+        options.add_argument(f"--user-data-dir={profile.path}")
+        options.add_argument(f"--disk-cache-dir={profile.cache_dir}")
+        options.add_argument(f"--disk-cache-size={DISK_CACHE_MB * 1024 * 1024}")
 
     options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
     options.add_experimental_option('useAutomationExtension', False)
@@ -182,62 +467,611 @@ def start_driver(headless=HEADLESS):
 
     return driver
 
-def login_instagram(driver, username, password):
+# ---------- BROWSER BACKENDS ----------
+#
+# Scraping code talks to a BrowserBackend instead of a raw Selenium driver.
+# Element handles returned by query()/query_all()/wait_for() are opaque: only
+# pass them back into the backend that produced them.
+
+class BrowserBackend(ABC):
+    """
+    Navigate, query (XPath), eval script and cookies — everything the scraper
+    needs from a browser. Key names for press() are "Enter", "PageDown" and
+    "Escape". wait_for() raises the builtin TimeoutError on every backend.
+    """
+
+    @abstractmethod
+    def navigate(self, url):
+        raise NotImplementedError
+
+    def start_navigation(self, url):
+        """Begin loading `url` in the current tab; backends that can return before the load finishes do."""
+        self.navigate(url)
+
+    @property
+    @abstractmethod
+    def current_url(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def page_source(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def query_all(self, xpath, root=None):
+        raise NotImplementedError
+
+    def query(self, xpath, root=None):
+        found = self.query_all(xpath, root)
+        return found[0] if found else None
+
+    def wait_for(self, xpath, timeout, clickable=False):
+        deadline = time.monotonic() + timeout
+        while True:
+            elem = self.query(xpath)
+            if elem is not None:
+                return elem
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Timed out after {timeout}s waiting for {xpath}")
+            time.sleep(0.25)
+
+    @abstractmethod
+    def text(self, elem):
+        raise NotImplementedError
+
+    @abstractmethod
+    def attr(self, elem, name):
+        raise NotImplementedError
+
+    @abstractmethod
+    def click(self, elem):
+        raise NotImplementedError
+
+    @abstractmethod
+    def type(self, elem, text):
+        raise NotImplementedError
+
+    @abstractmethod
+    def press(self, elem, key):
+        raise NotImplementedError
+
+    @abstractmethod
+    def hover(self, elem):
+        raise NotImplementedError
+
+    @abstractmethod
+    def eval_script(self, script, *args):
+        """Run `script` as a function body; element args are `arguments[i]`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_cookies(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_cookies(self, cookies):
+        raise NotImplementedError
+
+    @abstractmethod
+    def screenshot(self, path):
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def current_tab(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def new_tab(self):
+        """Open a tab in the same session and return its handle (the current tab is unchanged)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def switch_tab(self, handle):
+        raise NotImplementedError
+
+    @abstractmethod
+    def close_tab(self, handle):
+        raise NotImplementedError
+
+    @abstractmethod
+    def quit(self):
+        raise NotImplementedError
+
+
+class SeleniumBackend(BrowserBackend):
+    """Wraps the Chrome WebDriver from start_driver()."""
+
+    KEYS = {"Enter": Keys.RETURN, "PageDown": Keys.PAGE_DOWN, "Escape": Keys.ESCAPE}
+
+    def __init__(self, driver, profile=None):
+        self.driver = driver
+        self.profile = profile
+        self.first_load = None
+
+    def navigate(self, url):
+        started = time.monotonic()
+        self.driver.get(url)
+        if self.first_load is None:
+            self.first_load = time.monotonic() - started
+
+    def start_navigation(self, url):
+        # Returns as soon as the navigation is queued; chromedriver only blocks
+        # on it when this tab is used again
+        self.driver.execute_script("window.location.href = arguments[0];", url)
+
+    @property
+    def current_url(self):
+        return self.driver.current_url
+
+    def page_source(self):
+        return self.driver.page_source
+
+    def query_all(self, xpath, root=None):
+        return (root or self.driver).find_elements(By.XPATH, xpath)
+
+    def wait_for(self, xpath, timeout, clickable=False):
+        condition = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+        try:
+            return WebDriverWait(self.driver, timeout).until(condition((By.XPATH, xpath)))
+        except TimeoutException:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {xpath}")
+
+    def text(self, elem):
+        return elem.text
+
+    def attr(self, elem, name):
+        return elem.get_attribute(name)
+
+    def click(self, elem):
+        elem.click()
+
+    def type(self, elem, text):
+        elem.send_keys(text)
+
+    def press(self, elem, key):
+        elem.send_keys(self.KEYS[key])
+
+    def hover(self, elem):
+        ActionChains(self.driver).move_to_element(elem).perform()
+
+    def eval_script(self, script, *args):
+        return self.driver.execute_script(script, *args)
+
+    def get_cookies(self):
+        return self.driver.get_cookies()
+
+    def add_cookies(self, cookies):
+        for cookie in cookies:
+            self.driver.add_cookie(cookie)
+
+    def screenshot(self, path):
+        self.driver.save_screenshot(path)
+
+    @property
+    def current_tab(self):
+        return self.driver.current_window_handle
+
+    def new_tab(self):
+        current = self.driver.current_window_handle
+        self.driver.switch_to.new_window('tab')
+        handle = self.driver.current_window_handle
+        self.driver.switch_to.window(current)
+        return handle
+
+    def switch_tab(self, handle):
+        self.driver.switch_to.window(handle)
+
+    def close_tab(self, handle):
+        current = self.driver.current_window_handle
+        self.driver.switch_to.window(handle)
+        self.driver.close()
+        if handle != current:
+            self.driver.switch_to.window(current)
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        finally:
+            if self.profile:
+                self.profile.release()
+
+
+class PlaywrightBrowser:
+    """
+    One Chromium process driven by async Playwright on a private event-loop
+    thread. Each new_backend() gets its own isolated context (cookies, cache,
+    storage), so many logged-in sessions can share a single browser process.
+    """
+
+    def __init__(self, headless=HEADLESS):
+        from playwright.async_api import async_playwright
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        browser_binary, _ = _find_browser()
+        args = ["--disable-blink-features=AutomationControlled", "--disable-notifications", "--lang=en-US"]
+        if platform.system() != "Darwin":
+            args += ["--no-sandbox", "--disable-dev-shm-usage"]
+
+        self._playwright = self.run(async_playwright().start())
+        self._browser = self.run(self._playwright.chromium.launch(
+            headless=headless, executable_path=browser_binary, args=args
+        ))
+
+    def run(self, coro):
+        """Run a coroutine on the browser's loop and block for its result (thread-safe)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def new_backend(self, owns_browser=False):
+        context = self.run(self._browser.new_context(
+            user_agent=_user_agent(),
+            locale="en-US",
+            viewport={"width": 1920, "height": 1080},
+        ))
+        self.run(context.add_init_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"))
+        page = self.run(context.new_page())
+        return PlaywrightBackend(self, context, page, owns_browser=owns_browser)
+
+    def close(self):
+        try:
+            self.run(self._browser.close())
+            self.run(self._playwright.stop())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+class PlaywrightBackend(BrowserBackend):
+    """A single Playwright browser context + page, see PlaywrightBrowser."""
+
+    def __init__(self, browser, context, page, owns_browser=False):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.owns_browser = owns_browser
+        self._pending = {}
+
+    def navigate(self, url):
+        self.browser.run(self.page.goto(url, wait_until="load"))
+
+    def start_navigation(self, url):
+        self._pending[self.page] = asyncio.run_coroutine_threadsafe(
+            self.page.goto(url, wait_until="domcontentloaded"), self.browser._loop
+        )
+
+    @property
+    def current_url(self):
+        return self.page.url
+
+    def page_source(self):
+        return self.browser.run(self.page.content())
+
+    def query_all(self, xpath, root=None):
+        return self.browser.run((root or self.page).query_selector_all(f"xpath={xpath}"))
+
+    def wait_for(self, xpath, timeout, clickable=False):
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+        try:
+            return self.browser.run(self.page.wait_for_selector(
+                f"xpath={xpath}", timeout=timeout * 1000, state="visible" if clickable else "attached"
+            ))
+        except PlaywrightTimeout:
+            raise TimeoutError(f"Timed out after {timeout}s waiting for {xpath}")
+
+    def text(self, elem):
+        return self.browser.run(elem.inner_text())
+
+    def attr(self, elem, name):
+        # Prefer the DOM property like Selenium does, so hrefs come back absolute
+        return self.browser.run(elem.evaluate("(e, n) => e[n] ?? e.getAttribute(n)", name))
+
+    def click(self, elem):
+        self.browser.run(elem.click())
+
+    def type(self, elem, text):
+        self.browser.run(elem.type(text))
+
+    def press(self, elem, key):
+        self.browser.run(elem.press(key))
+
+    def hover(self, elem):
+        self.browser.run(elem.hover())
+
+    def eval_script(self, script, *args):
+        return self.browser.run(self.page.evaluate(
+            "(args) => (function() { " + script + " }).apply(null, args)", list(args)
+        ))
+
+    def get_cookies(self):
+        return self.browser.run(self.context.cookies())
+
+    def add_cookies(self, cookies):
+        self.browser.run(self.context.add_cookies(cookies))
+
+    def screenshot(self, path):
+        self.browser.run(self.page.screenshot(path=path))
+
+    @property
+    def current_tab(self):
+        return self.page
+
+    def new_tab(self):
+        return self.browser.run(self.context.new_page())
+
+    def switch_tab(self, handle):
+        self.page = handle
+        pending = self._pending.pop(handle, None)
+        if pending is not None:
+            try:
+                pending.result()
+            except Exception as e:
+                print(f"  ⚠️  Background navigation failed: {e}")
+
+    def close_tab(self, handle):
+        self._pending.pop(handle, None)
+        self.browser.run(handle.close())
+
+    def quit(self):
+        try:
+            self.browser.run(self.context.close())
+        finally:
+            if self.owns_browser:
+                self.browser.close()
+
+
+NOT_FOUND_HTML = "<html><head></head><body><h2>Sorry, this page isn't available.</h2></body></html>"
+
+
+class FakeBackend(BrowserBackend):
+    """
+    In-memory backend that serves fixture HTML by URL — no browser, no network.
+    XPath runs on lxml (pip install lxml). Scripts are answered by `scripts`, a
+    list of (substring, callable) pairs matched against the script source.
+    Unmatched scripts return None, except "click()" which follows links and
+    scroll metrics, which read as 0 (a page that never grows).
+    """
+
+    def __init__(self, pages=None, scripts=None):
+        import lxml.html
+        self._parse = lxml.html.document_fromstring
+        self.pages = dict(pages or {})
+        self.scripts = list(scripts or [])
+        self.cookies = []
+        self.navigations = []
+        self._url = "about:blank"
+        self._doc = self._parse(NOT_FOUND_HTML)
+        self._tabs = {0: (self._url, self._doc)}
+        self._tab = 0
+
+    def navigate(self, url):
+        self.navigations.append(url)
+        self._url = url
+        html = self.pages.get(url) or self.pages.get(url.rstrip("/") + "/") or NOT_FOUND_HTML
+        self._doc = self._parse(html)
+
+    @property
+    def current_url(self):
+        return self._url
+
+    def page_source(self):
+        import lxml.html
+        return lxml.html.tostring(self._doc, encoding="unicode")
+
+    def query_all(self, xpath, root=None):
+        return list((root if root is not None else self._doc).xpath(xpath))
+
+    BLOCK_TAGS = frozenset(("address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+                            "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+                            "li", "main", "nav", "ol", "p", "pre", "section", "table", "tr", "ul"))
+
+    def text(self, elem):
+        """Rendered text like Selenium's .text: <br> and block boundaries become newlines."""
+        parts = []
+
+        def walk(node):
+            tag = node.tag if isinstance(node.tag, str) else None
+            if tag == "br":
+                parts.append("\n")
+            elif tag is not None and tag not in ("script", "style", "template"):
+                block = tag in self.BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                parts.append(node.text or "")
+                for child in node:
+                    walk(child)
+                    parts.append(child.tail or "")
+                if block:
+                    parts.append("\n")
+
+        walk(elem)
+        lines = (" ".join(line.split()) for line in "".join(parts).split("\n"))
+        return "\n".join(line for line in lines if line)
+
+    def attr(self, elem, name):
+        value = elem.get(name)
+        if value is not None and name in ("href", "src"):
+            value = urljoin(self._url, value)
+        return value
+
+    def click(self, elem):
+        href = self.attr(elem, "href")
+        if href:
+            self.navigate(href)
+
+    def type(self, elem, text):
+        elem.set("value", (elem.get("value") or "") + text)
+
+    def press(self, elem, key):
+        if key != "Enter":
+            return
+        form = next(elem.iterancestors("form"), None)
+        if form is not None and form.get("action"):
+            self.navigate(urljoin(self._url, form.get("action")))
+
+    def hover(self, elem):
+        pass
+
+    def eval_script(self, script, *args):
+        for needle, handler in self.scripts:
+            if needle in script:
+                return handler(*args)
+        if "click()" in script and args:
+            self.click(args[0])
+        if script.startswith("return arguments[0].scroll"):
+            return 0
+        return None
+
+    def get_cookies(self):
+        return list(self.cookies)
+
+    def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    def screenshot(self, path):
+        pass
+
+    @property
+    def current_tab(self):
+        return self._tab
+
+    def new_tab(self):
+        handle = max(self._tabs) + 1
+        self._tabs[handle] = ("about:blank", self._parse(NOT_FOUND_HTML))
+        return handle
+
+    def switch_tab(self, handle):
+        if self._tab in self._tabs:
+            self._tabs[self._tab] = (self._url, self._doc)
+        self._tab = handle
+        self._url, self._doc = self._tabs[handle]
+
+    def close_tab(self, handle):
+        self._tabs.pop(handle)
+
+    def quit(self):
+        pass
+
+
+def open_backend(backend=BACKEND, headless=HEADLESS):
+    if backend == "playwright":
+        if PROFILE_DIR:
+            print("  Note: PROFILE_DIR is only used by the selenium backend")
+        return PlaywrightBrowser(headless=headless).new_backend(owns_browser=True)
+    profile = ChromeProfile.acquire_free() if PROFILE_DIR else None
+    try:
+        return SeleniumBackend(start_driver(headless=headless, profile=profile), profile=profile)
+    except Exception:
+        if profile:
+            profile.release()
+        raise
+
+
+# ---------- INSTAGRAM ----------
+
+def detect_challenge(browser):
+    """A short reason if the current page is an Instagram challenge/limit page, else None."""
+    url = browser.current_url
+    for part in CHALLENGE_URL_PARTS:
+        if part in url:
+            return f"redirected to {url}"
+    if browser.query(CHALLENGE_XPATH) is not None:
+        return "Instagram is limiting this account"
+    return None
+
+def has_session(browser):
+    """True when the browser already holds a logged-in Instagram session (e.g. a warm PROFILE_DIR)."""
+    return any(cookie.get("name") == "sessionid" and cookie.get("value") for cookie in browser.get_cookies())
+
+def pass_challenge(browser):
+    """If Instagram shows a challenge, give the user WAIT_BUDGETS["challenge"] to finish it; False if they don't."""
+    challenge = detect_challenge(browser)
+    if not challenge:
+        return True
+    print(f"⚠️  Instagram wants verification ({challenge}).")
+    print(f"   Complete it in the browser window within {WAIT_BUDGETS['challenge']}s...")
+    if not wait_until(lambda: detect_challenge(browser) is None, "challenge"):
+        print("✗ Verification not completed")
+        browser.screenshot("login_challenge.png")
+        return False
+    return True
+
+def login_instagram(browser, username, password):
     try:
         print("Navigating to Instagram login...")
-        driver.get("https://www.instagram.com/accounts/login/")
-        rand_sleep(3, 5)
+        PACING.before_navigation()
+        browser.navigate("https://www.instagram.com/accounts/login/")
+        
+        # A warm profile is redirected away from the login page instead of showing
+        # the form - possibly to a challenge, which must be handled first
+        wait_until(
+            lambda: has_session(browser) or detect_challenge(browser) is not None
+                    or browser.query("//input[@name='username']") is not None,
+            "login_form"
+        )
+        if not pass_challenge(browser):
+            return False
+        if has_session(browser):
+            print("✓ Already logged in (existing session)")
+            return True
         
         # Accept cookies
         try:
-            cookie_button = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Allow') or contains(text(), 'Accept')]"))
+            cookie_button = wait_ready(
+                browser, "cookie_banner",
+                "//button[contains(text(), 'Allow') or contains(text(), 'Accept')]", clickable=True
             )
-            cookie_button.click()
+            browser.click(cookie_button)
             rand_sleep(1, 2)
         except:
             pass
         
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.NAME, "username"))
-        )
+        wait_ready(browser, "login_form", "//input[@name='username']")
         
-        username_input = driver.find_element(By.NAME, "username")
-        password_input = driver.find_element(By.NAME, "password")
+        username_input = browser.query("//input[@name='username']")
+        password_input = browser.query("//input[@name='password']")
         
         # Type slowly
         for char in username:
-            username_input.send_keys(char)
+            browser.type(username_input, char)
             time.sleep(random.uniform(0.1, 0.3))
         
         rand_sleep(0.5, 1)
         
         for char in password:
-            password_input.send_keys(char)
+            browser.type(password_input, char)
             time.sleep(random.uniform(0.1, 0.3))
         
         rand_sleep(1, 2)
-        password_input.send_keys(Keys.RETURN)
-        rand_sleep(5, 8)
+        browser.press(password_input, "Enter")
+        
+        settled = wait_until(
+            lambda: "/accounts/login" not in browser.current_url
+                    or browser.query("//*[@id='slfErrorAlert'] | //div[@role='alert']") is not None,
+            "login_result"
+        )
+        if not pass_challenge(browser):
+            return False
         
-        if "/accounts/login" not in driver.current_url:
+        if settled and "/accounts/login" not in browser.current_url:
             print("✓ Login successful!")
             
             # Handle dialogs
             try:
-                not_now = WebDriverWait(driver, 8).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Not now') or contains(text(), 'Not Now')]"))
+                not_now = wait_ready(
+                    browser, "dismiss_dialog",
+                    "//button[contains(text(), 'Not now') or contains(text(), 'Not Now')]", clickable=True
                 )
-                not_now.click()
+                browser.click(not_now)
                 rand_sleep(1, 2)
             except:
                 pass
             
             try:
-                not_now = WebDriverWait(driver, 8).until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Not Now')]"))
-                )
-                not_now.click()
+                not_now = wait_ready(browser, "dismiss_dialog", "//button[contains(text(), 'Not Now')]", clickable=True)
+                browser.click(not_now)
                 rand_sleep(1, 2)
             except:
                 pass
@@ -245,45 +1079,40 @@ def login_instagram(driver, username, password):
             return True
         else:
             print("✗ Login failed")
-            driver.save_screenshot("login_failed.png")
+            browser.screenshot("login_failed.png")
             return False
             
     except Exception as e:
         print(f"✗ Login error: {e}")
-        driver.save_screenshot("login_error.png")
+        browser.screenshot("login_error.png")
         return False
 
-def open_following_modal(driver, target_username):
+def open_following_modal(browser, target_username):
     profile_url = f"https://www.instagram.com/{target_username}/"
     print(f"Opening profile: {profile_url}")
     
     try:
-        driver.get(profile_url)
-        rand_sleep(5, 8)
+        PACING.before_navigation()
+        browser.navigate(profile_url)
         
-        WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located((By.TAG_NAME, "header"))
-        )
+        wait_ready(browser, "profile", PROFILE_READY)
         
         # Check if private
-        try:
-            driver.find_element(By.XPATH, "//*[contains(text(), 'This account is private') or contains(text(), 'This Account is Private')]")
+        if browser.query("//*[contains(text(), 'This account is private') or contains(text(), 'This Account is Private')]") is not None:
             print("✗ Account is private!")
             return None
-        except:
-            pass
         
         # Find following link - try multiple methods
         following_clicked = False
         
         # Method 1: Direct href
         try:
-            following_btn = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, f"//a[contains(@href, '/{target_username}/following')]"))
+            following_btn = wait_ready(
+                browser, "following_link", f"//a[contains(@href, '/{target_username}/following')]", clickable=True
             )
-            driver.execute_script("arguments[0].scrollIntoView(true);", following_btn)
+            browser.eval_script("arguments[0].scrollIntoView(true);", following_btn)
             rand_sleep(0.5, 1)
-            driver.execute_script("arguments[0].click();", following_btn)
+            browser.eval_script("arguments[0].click();", following_btn)
             following_clicked = True
             print("✓ Clicked following (method 1)")
         except:
@@ -292,11 +1121,11 @@ def open_following_modal(driver, target_username):
         # Method 2: Search all links
         if not following_clicked:
             try:
-                links = driver.find_elements(By.XPATH, "//header//a")
+                links = browser.query_all("//header//a")
                 for link in links:
-                    href = link.get_attribute('href') or ""
+                    href = browser.attr(link, 'href') or ""
                     if 'following' in href.lower():
-                        driver.execute_script("arguments[0].click();", link)
+                        browser.eval_script("arguments[0].click();", link)
                         following_clicked = True
                         print("✓ Clicked following (method 2)")
                         break
@@ -305,49 +1134,76 @@ def open_following_modal(driver, target_username):
         
         # Method 3: Click by text
         if not following_clicked:
-            try:
-                following_btn = driver.find_element(By.XPATH, "//a[contains(text(), 'following') or contains(text(), 'Following')]")
-                driver.execute_script("arguments[0].click();", following_btn)
+            following_btn = browser.query("//a[contains(text(), 'following') or contains(text(), 'Following')]")
+            if following_btn is not None:
+                browser.eval_script("arguments[0].click();", following_btn)
                 following_clicked = True
                 print("✓ Clicked following (method 3)")
-            except:
-                pass
         
         if not following_clicked:
             print("✗ Could not click following button")
-            driver.save_screenshot("following_not_found.png")
+            browser.screenshot("following_not_found.png")
             return None
         
-        rand_sleep(3, 5)
-        
         # Wait for modal
-        modal = WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.XPATH, "//div[@role='dialog']"))
-        )
+        modal = wait_ready(browser, "modal", "//div[@role='dialog']")
         print("✓ Following modal opened")
         
-        # Give modal time to initialize
-        rand_sleep(2, 3)
+        # Wait for the first rows instead of a fixed settle time
+        try:
+            wait_ready(browser, "modal_rows", "//div[@role='dialog']//a[contains(@href, '/')]")
+        except TimeoutError:
+            print("  ⚠️  Modal has no rows yet - collecting anyway")
         
         return modal
         
     except Exception as e:
         print(f"✗ Error opening modal: {e}")
-        driver.save_screenshot("modal_error.png")
+        browser.screenshot("modal_error.png")
         return None
 
-def collect_usernames_from_modal(driver, modal, max_count=None):
+def username_from_href(href, target):
+    """The account a profile link points to, or None for non-profile and self links."""
+    if not href:
+        return None
+    match = re.match(r"https?://(www\.)?instagram\.com/([^/?#]+)/?", href)
+    if not match:
+        return None
+    username = match.group(2).strip("/")
+    if (username.lower() not in RESERVED_INSTAGRAM_PATHS and
+        username.lower() != target.lower() and
+        len(username) > 1 and
+        not username.startswith('hashtag')):
+        return username
+    return None
+
+def collect_usernames_from_modal(browser, modal, max_count=None, journal=None,
+                                 target=None, output_file=""):
     """
     Aggressively scroll the modal and collect ALL usernames.
     Uses multiple scrolling strategies with extended patience.
+    With a UsernameJournal, each new username is streamed to disk as it is
+    found and usernames recovered from an interrupted run count as collected.
+    The list is saved to <target>_usernames.txt unless output_file is None.
     """
-    usernames = set()
-    prev_count = 0
+    target = target or TARGET_ACCOUNT
+    if output_file == "":
+        output_file = f"{target}_usernames.txt"
+    recovered = set(journal.recovered) if journal else set()
+    usernames = set(recovered)
+    prev_count = len(usernames)
     no_change_count = 0
     scroll_attempt = 0
     max_no_change = int(SCROLL_MAX_NO_CHANGE * SCROLL_PATIENCE_MULTIPLIER)
     consecutive_failures = 0
     last_scroll_height = 0
+    # Resumed run: rows the journal already has are skipped at FAST_FORWARD_PAUSE
+    # until the first unseen username shows up
+    fast_forward = bool(recovered)
+    # The list is virtualized (rows leave the DOM as they scroll away), so each
+    # batch of new rows is archived as its own snapshot while collecting
+    archive_kind = f"modals/{target}"
+    archive_seq = len(list((Path(ARCHIVE_DIR) / archive_kind).glob("*.html.gz"))) if ARCHIVE_DIR else 0
     
     print("Collecting usernames from modal...")
     print("This may take a while - please be patient...")
@@ -355,9 +1211,9 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
     # Find the scrollable div inside the modal
     scrollable_div = None
     try:
-        possible_divs = modal.find_elements(By.XPATH, ".//div")
+        possible_divs = browser.query_all(".//div", modal)
         for div in possible_divs:
-            overflow = driver.execute_script(
+            overflow = browser.eval_script(
                 "return window.getComputedStyle(arguments[0]).overflowY;", div
             )
             if overflow in ['scroll', 'auto']:
@@ -367,13 +1223,13 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
     except:
         pass
     
-    if not scrollable_div:
+    if scrollable_div is None:
         scrollable_div = modal
         print("Using modal as scrollable container")
     
     # Get initial scroll height
     try:
-        last_scroll_height = driver.execute_script(
+        last_scroll_height = browser.eval_script(
             "return arguments[0].scrollHeight;", scrollable_div
         )
     except:
@@ -384,22 +1240,15 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Extract usernames from current view
         try:
-            links = scrollable_div.find_elements(By.XPATH, ".//a[contains(@href, '/')]")
+            links = browser.query_all(".//a[contains(@href, '/')]", scrollable_div)
             
             for link in links:
                 try:
-                    href = link.get_attribute("href")
-                    if href:
-                        match = re.match(r"https?://(www\.)?instagram\.com/([^/?#]+)/?", href)
-                        if match:
-                            username = match.group(2).strip("/")
-                            excluded = ['explore', 'p', 'reel', 'reels', 'tv', 'stories', 
-                                      'direct', 'accounts', 'about', 'legal', 'help']
-                            if (username.lower() not in excluded and
-                                username.lower() != TARGET_ACCOUNT.lower() and
-                                len(username) > 1 and
-                                not username.startswith('hashtag')):
-                                usernames.add(username)
+                    username = username_from_href(browser.attr(link, "href"), target)
+                    if username and username not in usernames:
+                        usernames.add(username)
+                        if journal:
+                            journal.add(username)
                 except (StaleElementReferenceException, AttributeError):
                     continue
         except StaleElementReferenceException:
@@ -409,7 +1258,7 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Check if scroll height changed (indicates new content loaded)
         try:
-            current_scroll_height = driver.execute_script(
+            current_scroll_height = browser.eval_script(
                 "return arguments[0].scrollHeight;", scrollable_div
             )
             if current_scroll_height > last_scroll_height:
@@ -420,9 +1269,19 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         except:
             pass
         
+        if fast_forward and current_count > prev_count:
+            fast_forward = False
+            print(f"  ⏩ Reached unseen usernames at scroll #{scroll_attempt} - back to normal pace")
+        
         # Log progress
         if current_count > prev_count:
             print(f"  📊 Collected {current_count} usernames... (scroll #{scroll_attempt})")
+            if ARCHIVE_DIR:
+                try:
+                    archive_seq += 1
+                    archive_page(archive_kind, f"{archive_seq:05d}", browser.page_source())
+                except Exception as e:
+                    print(f"    ⚠️  Could not archive the modal: {e}")
             no_change_count = 0
             consecutive_failures = 0
             prev_count = current_count
@@ -441,11 +1300,25 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
             print(f"✓ No new content after {max_no_change} attempts - stopping")
             break
         
+        # Fast-forward: only scroll to the bottom while the list keeps growing;
+        # once it stalls, the normal strategies below give it time to load
+        if fast_forward and consecutive_failures == 0:
+            no_change_count = 0
+            try:
+                browser.eval_script(
+                    "arguments[0].scrollTop = arguments[0].scrollHeight;",
+                    scrollable_div
+                )
+            except:
+                pass
+            time.sleep(FAST_FORWARD_PAUSE)
+            continue
+        
         # SUPER AGGRESSIVE SCROLLING with multiple strategies
         
         # Strategy 1: Scroll to absolute bottom
         try:
-            driver.execute_script(
+            browser.eval_script(
                 "arguments[0].scrollTop = arguments[0].scrollHeight;", 
                 scrollable_div
             )
@@ -456,10 +1329,10 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Strategy 2: Scroll by large fixed amount
         try:
-            current_scroll = driver.execute_script(
+            current_scroll = browser.eval_script(
                 "return arguments[0].scrollTop;", scrollable_div
             )
-            driver.execute_script(
+            browser.eval_script(
                 "arguments[0].scrollTop = arguments[1] + 500;", 
                 scrollable_div, current_scroll
             )
@@ -470,10 +1343,9 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Strategy 3: Keyboard scrolling with ActionChains
         try:
-            actions = ActionChains(driver)
-            actions.move_to_element(scrollable_div).perform()
+            browser.hover(scrollable_div)
             for _ in range(3):
-                scrollable_div.send_keys(Keys.PAGE_DOWN)
+                browser.press(scrollable_div, "PageDown")
                 time.sleep(0.2)
         except:
             pass
@@ -482,10 +1354,10 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Strategy 4: Scroll to last visible element
         try:
-            all_items = scrollable_div.find_elements(By.XPATH, ".//a")
+            all_items = browser.query_all(".//a", scrollable_div)
             if len(all_items) > 5:
                 last_item = all_items[-2]
-                driver.execute_script(
+                browser.eval_script(
                     "arguments[0].scrollIntoView({behavior: 'smooth', block: 'end'});", 
                     last_item
                 )
@@ -496,7 +1368,7 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
         
         # Strategy 5: Mouse wheel simulation
         try:
-            driver.execute_script(
+            browser.eval_script(
                 "arguments[0].dispatchEvent(new WheelEvent('wheel', {deltaY: 1000}));",
                 scrollable_div
             )
@@ -510,14 +1382,14 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
             print(f"  💪 Aggressive scroll burst at attempt {scroll_attempt}...")
             try:
                 for i in range(5):
-                    driver.execute_script(
+                    browser.eval_script(
                         "arguments[0].scrollTop = arguments[0].scrollHeight;", 
                         scrollable_div
                     )
                     time.sleep(0.3)
                     
                     # Also try scrolling by pixels
-                    driver.execute_script(
+                    browser.eval_script(
                         "arguments[0].scrollBy(0, 1000);", 
                         scrollable_div
                     )
@@ -530,13 +1402,13 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
             print(f"  🔄 Refreshing modal at attempt {scroll_attempt}...")
             try:
                 # Click somewhere safe in modal to trigger re-render
-                driver.execute_script("arguments[0].click();", scrollable_div)
+                browser.eval_script("arguments[0].click();", scrollable_div)
                 time.sleep(0.5)
                 
                 # Scroll to top then back to bottom
-                driver.execute_script("arguments[0].scrollTop = 0;", scrollable_div)
+                browser.eval_script("arguments[0].scrollTop = 0;", scrollable_div)
                 time.sleep(0.5)
-                driver.execute_script(
+                browser.eval_script(
                     "arguments[0].scrollTop = arguments[0].scrollHeight;", 
                     scrollable_div
                 )
@@ -546,11 +1418,18 @@ def collect_usernames_from_modal(driver, modal, max_count=None):
     
     result = sorted(list(usernames))
     print(f"\n✓ Final count: {len(result)} unique usernames collected")
+    if recovered:
+        print(f"  ({len(recovered)} recovered from the interrupted run, "
+              f"{len(usernames - recovered)} newly collected)")
     
     # Save usernames to file
-    with open(f"{TARGET_ACCOUNT}_usernames.txt", "w") as f:
-        f.write("\n".join(result))
-    print(f"✓ Usernames saved to {TARGET_ACCOUNT}_usernames.txt")
+    if output_file:
+        with open(output_file, "w") as f:
+            f.write("\n".join(result))
+        print(f"✓ Usernames saved to {output_file}")
+    
+    if journal:
+        journal.finish()
     
     return result
 
@@ -560,13 +1439,13 @@ def extract_email(text):
     matches = EMAIL_PATTERN.findall(text)
     return matches[0] if matches else ""
 
-def extract_external_links(driver):
+def extract_external_links(browser):
     links = []
     try:
-        link_elements = driver.find_elements(By.XPATH, "//header//a[starts-with(@href, 'http') and not(contains(@href, 'instagram.com'))]")
+        link_elements = browser.query_all("//header//a[starts-with(@href, 'http') and not(contains(@href, 'instagram.com'))]")
         for elem in link_elements:
             try:
-                href = elem.get_attribute('href')
+                href = browser.attr(elem, 'href')
                 if href and 'instagram.com' not in href:
                     links.append(href)
             except:
@@ -576,18 +1455,12 @@ def extract_external_links(driver):
     
     return ", ".join(links) if links else ""
 
-def check_verified(driver):
-    try:
-        driver.find_element(By.XPATH, "//header//*[name()='svg' and @aria-label='Verified']")
-        return "Yes"
-    except:
-        try:
-            driver.find_element(By.XPATH, "//header//*[contains(@aria-label, 'Verified') or contains(@title, 'Verified')]")
-            return "Yes"
-        except:
-            return "No"
+def check_verified(browser):
+    if browser.query("//header//*[name()='svg' and @aria-label='Verified']") is not None:
+        return True
+    return browser.query("//header//*[contains(@aria-label, 'Verified') or contains(@title, 'Verified')]") is not None
 
-def parse_stat_number(text):
+def parse_stat_number(text) -> Optional[int]:
     if not text:
         return None
     
@@ -599,65 +1472,119 @@ def parse_stat_number(text):
         if suffix in text:
             try:
                 num = float(text.replace(suffix, ''))
-                return str(int(num * multiplier))
+                return int(num * multiplier)
             except:
-                return text
+                return None
     
     try:
-        return str(int(float(text)))
+        return int(float(text))
     except:
-        return text
+        return None
+
+class ProfileRecord:
+    """One scraped profile. Counts are ints (None when unknown); verified is a bool."""
+
+    __slots__ = ("username", "name", "followers", "posts", "bio", "email",
+                 "verified", "profile_link", "bio_links")
+    FIELDS = __slots__
+
+    def __init__(self, username, name="", followers=None, posts=None, bio="",
+                 email="", verified=False, profile_link="", bio_links=""):
+        self.username = username
+        self.name = name
+        self.followers = followers
+        self.posts = posts
+        self.bio = bio
+        self.email = email
+        self.verified = verified
+        self.profile_link = profile_link or profile_url(username)
+        self.bio_links = bio_links
+
+    def has_data(self):
+        """False when the page gave us nothing (timeout, removed account): no counts, name, bio or links."""
+        return (self.followers is not None or self.posts is not None
+                or any((self.name, self.bio, self.email, self.bio_links)))
+
+    def __repr__(self):
+        return f"ProfileRecord({', '.join(f'{f}={getattr(self, f)!r}' for f in self.FIELDS)})"
+
+def profile_url(username):
+    return f"https://www.instagram.com/{username}/"
+
+def scrape_profile(browser, username):
+    try:
+        PACING.before_navigation()
+        browser.navigate(profile_url(username))
+    except Exception as e:
+        print(f"  ✗ Error loading {username}: {e}")
+        return ProfileRecord(username)
+    
+    return extract_profile(browser, username)
 
-def scrape_profile(driver, username):
-    url = f"https://www.instagram.com/{username}/"
+def on_profile(browser, username):
+    """True once the current tab has committed to `username`'s profile URL."""
+    return browser.current_url.lower().startswith(profile_url(username).lower())
+
+def extract_profile(browser, username):
+    """Wait for the profile in the current tab, archive it if enabled, and parse it."""
+    try:
+        # A reused pipeline tab keeps showing the previous profile (whose header
+        # already matches PROFILE_READY) until the queued navigation commits
+        if not wait_until(lambda: on_profile(browser, username), "profile"):
+            raise TimeoutError(f"tab is still on {browser.current_url}")
+        wait_ready(browser, "profile", PROFILE_READY)
+    except Exception as e:
+        challenge = detect_challenge(browser)
+        if challenge:
+            raise AccountChallenged(challenge)
+        if not on_profile(browser, username) or browser.query(PROFILE_META) is None:
+            print(f"  ✗ Error scraping {username}: {e}")
+            return ProfileRecord(username)
+        # Header never rendered, but the meta still gives followers and posts
+        print(f"    ⚠️  Profile header not rendered for {username}; using counts from meta only")
     
-    data = {
-        "username": username,
-        "name": "",
-        "followers": "",
-        "posts": "",
-        "bio": "",
-        "email": "",
-        "verified": "No",
-        "profile_link": url,
-        "bio_links": ""
-    }
+    if ARCHIVE_DIR:
+        try:
+            archive_page("profiles", username, browser.page_source())
+        except Exception as e:
+            print(f"    ⚠️  Could not archive {username}: {e}")
+    
+    return parse_profile(browser, username)
+
+def parse_profile(browser, username):
+    """Extract profile fields from the page already loaded in the current tab."""
+    data = ProfileRecord(username)
     
     try:
-        driver.get(url)
-        rand_sleep(3, 5)
-        
-        WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located((By.TAG_NAME, "header"))
-        )
-        
         # PRIORITY 1: Try meta tag first (most reliable)
         try:
-            meta = driver.find_element(By.XPATH, "//meta[@property='og:description']")
-            content = meta.get_attribute("content")
+            meta = browser.query("//meta[@property='og:description']")
+            if meta is None:
+                raise NoSuchElementException("og:description meta not found")
+            content = browser.attr(meta, "content")
             
             # Pattern: "X Followers, Y Following, Z Posts - See Instagram..."
             followers_match = re.search(r'([\d,\.]+[KMB]?)\s+Followers', content, re.IGNORECASE)
             posts_match = re.search(r'([\d,\.]+[KMB]?)\s+Posts', content, re.IGNORECASE)
             
             if followers_match:
-                data["followers"] = parse_stat_number(followers_match.group(1))
-                print(f"    📊 Followers from meta: {data['followers']}")
+                data.followers = parse_stat_number(followers_match.group(1))
+                print(f"    📊 Followers from meta: {data.followers}")
             if posts_match:
-                data["posts"] = parse_stat_number(posts_match.group(1))
-                print(f"    📊 Posts from meta: {data['posts']}")
+                data.posts = parse_stat_number(posts_match.group(1))
+                print(f"    📊 Posts from meta: {data.posts}")
         except Exception as e:
             print(f"    ⚠️  Meta tag method failed: {e}")
         
         # PRIORITY 2: Parse stats from header list items
-        if not data["followers"] or not data["posts"]:
+        if data.followers is None or data.posts is None:
             try:
                 # Get all list items in header
-                stat_items = driver.find_elements(By.XPATH, "//header//ul/li")
+                stat_items = browser.query_all("//header//ul/li")
                 
                 for item in stat_items:
                     try:
-                        item_text = item.text.strip().lower()
+                        item_text = browser.text(item).strip().lower()
                         
                         # Split by newlines and spaces
                         parts = re.split(r'[\n\s]+', item_text)
@@ -672,41 +1599,41 @@ def scrape_profile(driver, username):
                                     label = parts[i + 1].lower()
 
                                     if 'post' in label:
-                                        data["posts"] = parse_stat_number(number)
-                                        print(f"    📊 Posts from list: {data['posts']}")
+                                        data.posts = parse_stat_number(number)
+                                        print(f"    📊 Posts from list: {data.posts}")
                                     elif 'follower' in label:
-                                        data["followers"] = parse_stat_number(number)
-                                        print(f"    📊 Followers from list: {data['followers']}")
+                                        data.followers = parse_stat_number(number)
+                                        print(f"    📊 Followers from list: {data.followers}")
                     except:
                         continue
             except Exception as e:
                 print(f"    ⚠️  List parsing failed: {e}")
 
         # PRIORITY 3: Try direct link-based approach
-        if not data["followers"]:
+        if data.followers is None:
             try:
                 # Followers link contains '/followers/'
-                followers_link = driver.find_element(By.XPATH, "//a[contains(@href, '/followers/')]")
-                followers_text = followers_link.text.strip()
+                followers_link = browser.query("//a[contains(@href, '/followers/')]")
+                followers_text = browser.text(followers_link).strip()
                 
                 # Extract number from text like "1,234 followers" or just "1234"
                 number_match = re.search(r'([\d,\.]+[KMB]?)', followers_text, re.IGNORECASE)
                 if number_match:
-                    data["followers"] = parse_stat_number(number_match.group(1))
-                    print(f"    📊 Followers from link: {data['followers']}")
+                    data.followers = parse_stat_number(number_match.group(1))
+                    print(f"    📊 Followers from link: {data.followers}")
             except:
                 pass
         
-        if not data["posts"]:
+        if data.posts is None:
             try:
                 # Find element that shows post count (usually first in the list)
-                post_elements = driver.find_elements(By.XPATH, "//header//ul/li[1]//span")
+                post_elements = browser.query_all("//header//ul/li[1]//span")
                 for elem in post_elements:
-                    text = elem.text.strip()
+                    text = browser.text(elem).strip()
                     # Check if it's a number
                     if re.match(r'^[\d,\.]+[KMB]?$', text, re.IGNORECASE):
-                        data["posts"] = parse_stat_number(text)
-                        print(f"    📊 Posts from first li: {data['posts']}")
+                        data.posts = parse_stat_number(text)
+                        print(f"    📊 Posts from first li: {data.posts}")
                         break
             except:
                 pass
@@ -721,8 +1648,8 @@ def scrape_profile(driver, username):
         
         for selector in name_selectors:
             try:
-                name_elem = driver.find_element(By.XPATH, selector)
-                name = name_elem.text.strip()
+                name_elem = browser.query(selector)
+                name = browser.text(name_elem).strip()
                 # Make sure it's not the username and not a stat
                 if (name and 
                     name != username and 
@@ -730,8 +1657,8 @@ def scrape_profile(driver, username):
                     not re.match(r'^[\d,\.]+[KMB]?$', name, re.IGNORECASE) and
                     'post' not in name.lower() and
                     'follow' not in name.lower()):
-                    data["name"] = name
-                    print(f"    👤 Name: {data['name']}")
+                    data.name = name
+                    print(f"    👤 Name: {data.name}")
                     break
             except:
                 continue
@@ -745,42 +1672,42 @@ def scrape_profile(driver, username):
         
         for selector in bio_selectors:
             try:
-                bio_elems = driver.find_elements(By.XPATH, selector)
+                bio_elems = browser.query_all(selector)
                 for bio_elem in bio_elems:
-                    bio = bio_elem.text.strip()
+                    bio = browser.text(bio_elem).strip()
                     # Make sure it's not stats or username
                     if (bio and 
                         len(bio) > 5 and 
                         bio != username and
-                        bio != data.get("name", "") and
+                        bio != data.name and
                         not re.match(r'^[\d,\.]+[KMB]?\s+(post|follower|following)', bio, re.IGNORECASE)):
-                        data["bio"] = bio
+                        data.bio = bio
                         print(f"    📝 Bio: {bio[:50]}...")
                         break
-                if data["bio"]:
+                if data.bio:
                     break
             except:
                 continue
         
         # Extract email from bio
-        if data["bio"]:
-            email = extract_email(data["bio"])
+        if data.bio:
+            email = extract_email(data.bio)
             if email:
-                data["email"] = email
+                data.email = email
                 print(f"    📧 Email: {email}")
         
         # Check if verified
-        data["verified"] = check_verified(driver)
-        if data["verified"] == "Yes":
+        data.verified = check_verified(browser)
+        if data.verified:
             print(f"    ✓ Verified account")
         
         # Get external links from bio
-        bio_links = extract_external_links(driver)
+        bio_links = extract_external_links(browser)
         if bio_links:
-            data["bio_links"] = bio_links
+            data.bio_links = bio_links
             print(f"    🔗 Links: {bio_links}")
         
-        print(f"  ✓ {username}: {data['name']} | Followers: {data['followers']} | Posts: {data['posts']}")
+        print(f"  ✓ {username}: {data.name} | Followers: {data.followers} | Posts: {data.posts}")
         return data
         
     except Exception as e:
@@ -789,21 +1716,702 @@ def scrape_profile(driver, username):
         traceback.print_exc()
         return data
 
-def save_results(results, filename):
-    if not results:
-        print("No results to save")
-        return
+def scrape_profiles_sequential(browser, usernames):
+    total = len(usernames)
+    for i, username in enumerate(usernames, 1):
+        print(f"[{i}/{total}] Scraping {username}...")
+        yield username, scrape_profile(browser, username)
+
+def scrape_profiles_pipelined(browser, usernames, tabs=None):
+    """
+    Yield (username, data) in order, keeping up to `tabs` profiles loading in
+    tabs of the same browser. While one tab is being extracted the next ones
+    are already loading; navigations are still spaced by PACING, so this only
+    gains anything when loading plus extracting a profile takes longer than
+    the NAV_INTERVAL gap (sequential mode already overlaps the load with it).
+    """
+    tabs = tabs or PIPELINE_TABS
+    total = len(usernames)
+    pending = iter(usernames)
+    home = browser.current_tab
+    handles = [home] + [browser.new_tab() for _ in range(tabs - 1)]
+    free = list(handles)
+    in_flight = []
     
-    df = pd.DataFrame(results)
-    df.to_csv(filename, index=False, encoding='utf-8-sig')
-    print(f"✓ Saved {len(df)} profiles to {filename}")
+    def launch():
+        username = next(pending, None)
+        if username is None:
+            return False
+        handle = free.pop(0)
+        browser.switch_tab(handle)
+        PACING.before_navigation()
+        try:
+            browser.start_navigation(profile_url(username))
+        except Exception as e:
+            print(f"  ✗ Error loading {username}: {e}")
+        in_flight.append((username, handle))
+        return True
+    
+    try:
+        while free and launch():
+            pass
+        
+        i = 0
+        while in_flight:
+            i += 1
+            username, handle = in_flight.pop(0)
+            print(f"[{i}/{total}] Scraping {username} ({len(in_flight)} prefetching)...")
+            browser.switch_tab(handle)
+            data = extract_profile(browser, username)
+            free.append(handle)
+            launch()
+            yield username, data
+    finally:
+        for handle in handles[1:]:
+            try:
+                browser.close_tab(handle)
+            except Exception:
+                pass
+        browser.switch_tab(home)
+
+# ---------- RESULT STORAGE ----------
+
+class ResultBuffer:
+    """
+    Fixed-size, column-oriented buffer of ProfileRecords that appends to a CSV
+    every `capacity` rows. Only the current chunk is held in memory; counts
+    live in int64 arrays (-1 = unknown) and verified in a bytearray.
+    """
+
+    TEXT_FIELDS = ("username", "name", "bio", "email", "profile_link", "bio_links")
+
+    def __init__(self, path, capacity=None, append=False):
+        self.path = path
+        self.capacity = capacity or SAVE_FREQUENCY
+        self.text = {field: [""] * self.capacity for field in self.TEXT_FIELDS}
+        self.followers = array('q', [-1]) * self.capacity
+        self.posts = array('q', [-1]) * self.capacity
+        self.verified = bytearray(self.capacity)
+        self.size = 0
+        self.written = 0
+
+        if append and os.path.exists(path):
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                self.written = max(sum(1 for _ in csv.reader(f)) - 1, 0)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    @property
+    def total(self):
+        return self.written + self.size
+
+    def append(self, record):
+        i = self.size
+        for field in self.TEXT_FIELDS:
+            self.text[field][i] = getattr(record, field)
+        self.followers[i] = -1 if record.followers is None else record.followers
+        self.posts[i] = -1 if record.posts is None else record.posts
+        self.verified[i] = 1 if record.verified else 0
+        self.size += 1
+        if self.size == self.capacity:
+            self.flush()
+
+    def rows(self):
+        text = self.text
+        for i in range(self.size):
+            followers, posts = self.followers[i], self.posts[i]
+            yield (text["username"][i], text["name"][i],
+                   "" if followers < 0 else followers,
+                   "" if posts < 0 else posts,
+                   text["bio"][i], text["email"][i],
+                   "Yes" if self.verified[i] else "No",
+                   text["profile_link"][i], text["bio_links"][i])
+
+    def flush(self):
+        if not self.size:
+            return
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            if new_file:
+                writer.writerow(ProfileRecord.FIELDS)
+            writer.writerows(self.rows())
+        self.written += self.size
+        self.size = 0
+        print(f"✓ Saved {self.written} profiles to {self.path}")
+
+class SnapshotStore:
+    """
+    Append-only history of profile observations keyed by (username, timestamp),
+    in SQLite. Counts and verified are stored on every snapshot; text fields
+    are delta-encoded (NULL = unchanged since that user's previous snapshot).
+    A `latest` table mirrors the current state of each username so "latest"
+    queries never replay history.
+    """
+
+    COUNT_FIELDS = ("followers", "posts", "verified")
+    TEXT_FIELDS = ("name", "bio", "email", "bio_links")
+
+    def __init__(self, path=None):
+        self.path = path or SNAPSHOT_DB
+        self.db = sqlite3.connect(self.path)
+        columns = ", ".join(f"{f} INTEGER" for f in self.COUNT_FIELDS) + ", " + \
+                  ", ".join(f"{f} TEXT" for f in self.TEXT_FIELDS)
+        self.db.executescript(f"""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                username TEXT NOT NULL, ts REAL NOT NULL, {columns},
+                PRIMARY KEY (username, ts)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS latest (
+                username TEXT PRIMARY KEY, ts REAL NOT NULL, {columns}
+            ) WITHOUT ROWID;
+        """)
+
+    def append(self, record, ts=None):
+        return self.append_many([record], ts)
+
+    def append_many(self, records, ts=None):
+        """
+        Store one observation per record at `ts` and return how many were stored.
+        History only moves forward: a record whose username already has a
+        snapshot at or after `ts` is skipped, since its delta would be encoded
+        against the wrong predecessor.
+        """
+        ts = time.time() if ts is None else ts
+        fields = self.COUNT_FIELDS + self.TEXT_FIELDS
+        placeholders = ", ".join("?" * (len(fields) + 2))
+        stored_count = 0
+        with self.db:
+            for record in records:
+                current = [getattr(record, f) for f in fields]
+                current[fields.index("verified")] = int(bool(record.verified))
+                previous = self.db.execute(
+                    f"SELECT ts, {', '.join(self.TEXT_FIELDS)} FROM latest WHERE username = ?",
+                    (record.username,)
+                ).fetchone()
+                if previous and ts <= previous[0]:
+                    continue
+                stored = list(current)
+                if previous:
+                    for i, old in enumerate(previous[1:], len(self.COUNT_FIELDS)):
+                        if stored[i] == old:
+                            stored[i] = None
+                self.db.execute(f"INSERT INTO snapshots VALUES ({placeholders})",
+                                [record.username, ts] + stored)
+                self.db.execute(f"INSERT OR REPLACE INTO latest VALUES ({placeholders})",
+                                [record.username, ts] + current)
+                stored_count += 1
+        return stored_count
+
+    def _record(self, username, values):
+        data = dict(zip(self.COUNT_FIELDS + self.TEXT_FIELDS, values))
+        for field in self.TEXT_FIELDS:
+            data[field] = data[field] or ""
+        data["verified"] = bool(data["verified"])
+        return ProfileRecord(username, **data)
+
+    def latest(self, username=None):
+        """[(ts, ProfileRecord)] with the newest observation of each username (or just `username`)."""
+        fields = ", ".join(self.COUNT_FIELDS + self.TEXT_FIELDS)
+        if username:
+            rows = self.db.execute(f"SELECT username, ts, {fields} FROM latest WHERE username = ?", (username,))
+        else:
+            rows = self.db.execute(f"SELECT username, ts, {fields} FROM latest ORDER BY username")
+        return [(row[1], self._record(row[0], row[2:])) for row in rows]
+
+    def series(self, username, since=None, until=None):
+        """[(ts, ProfileRecord)] for every observation of `username`, oldest first."""
+        fields = ", ".join(self.COUNT_FIELDS + self.TEXT_FIELDS)
+        rows = self.db.execute(
+            f"SELECT ts, {fields} FROM snapshots WHERE username = ? AND ts <= ? ORDER BY ts",
+            (username, float("inf") if until is None else until)
+        )
+        history = []
+        text = [None] * len(self.TEXT_FIELDS)
+        for row in rows:
+            counts, deltas = row[1:1 + len(self.COUNT_FIELDS)], row[1 + len(self.COUNT_FIELDS):]
+            text = [old if new is None else new for old, new in zip(text, deltas)]
+            if since is None or row[0] >= since:
+                history.append((row[0], self._record(username, list(counts) + text)))
+        return history
+
+    def close(self):
+        self.db.close()
+
+def show_history(username=None, db=None):
+    store = SnapshotStore(db)
+    try:
+        if username:
+            print(f"{'observed':<20} {'followers':>10} {'posts':>7}  bio")
+            for ts, record in store.series(username):
+                print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(ts)):<20} "
+                      f"{record.followers if record.followers is not None else '':>10} "
+                      f"{record.posts if record.posts is not None else '':>7}  {record.bio[:50]}")
+        else:
+            latest = store.latest()
+            for ts, record in latest:
+                print(f"{record.username:<30} {record.followers if record.followers is not None else '':>10} "
+                      f"{time.strftime('%Y-%m-%d', time.localtime(ts))}")
+            print(f"{len(latest)} usernames tracked in {store.path}")
+    finally:
+        store.close()
+
+# ---------- PAGE ARCHIVE ----------
+
+def archive_page(kind, name, html_text, archive_dir=None):
+    """Store gzipped HTML as <archive_dir>/<kind>/<name>.html.gz (the newest fetch wins)."""
+    folder = Path(archive_dir or ARCHIVE_DIR) / kind
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"{name}.html.gz"
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(gzip.compress(html_text.encode("utf-8"), compresslevel=6))
+    os.replace(tmp, path)
+
+def _archived_name(path):
+    return Path(path).name[:-len(".html.gz")]
+
+def _archived_backend(path):
+    """A FakeBackend with the archived page at `path` loaded in its only tab."""
+    url = profile_url(_archived_name(path))
+    backend = FakeBackend({url: gzip.decompress(Path(path).read_bytes()).decode("utf-8")})
+    backend.navigate(url)
+    return backend
+
+def _reparse_profile(path):
+    import io
+    from contextlib import redirect_stdout
+    with redirect_stdout(io.StringIO()):
+        return parse_profile(_archived_backend(path), _archived_name(path))
+
+def _reparse_modal(path):
+    """Usernames from every snapshot in a modals/<target>/ folder (or a single archived modal)."""
+    path = Path(path)
+    target = path.name if path.is_dir() else _archived_name(path)
+    usernames = set()
+    for snapshot in sorted(path.glob("*.html.gz")) if path.is_dir() else [path]:
+        backend = _archived_backend(snapshot)
+        for link in backend.query_all("//div[@role='dialog']//a[contains(@href, '/')]"):
+            username = username_from_href(backend.attr(link, "href"), target)
+            if username:
+                usernames.add(username)
+    return target, sorted(usernames)
+
+def reparse_archive(archive_dir=None, output=None, workers=None):
+    """
+    Re-run extraction over every archived page with a process pool (all cores
+    by default) and write fresh results - no browser, no Instagram requests.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    archive = Path(archive_dir or ARCHIVE_DIR or "page_archive")
+    output = output or f"{TARGET_ACCOUNT}_followees_reparsed.csv"
+    profiles = sorted(str(p) for p in (archive / "profiles").glob("*.html.gz"))
+    modals = sorted(str(p) for p in (archive / "modals").glob("*")
+                    if p.is_dir() or p.name.endswith(".html.gz"))
+    if not profiles and not modals:
+        print(f"Nothing archived under {archive}")
+        return
+
+    started = time.perf_counter()
+    print(f"Re-parsing {len(profiles)} profiles and {len(modals)} modals from {archive} "
+          f"with {workers or os.cpu_count()} workers...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = ResultBuffer(output, capacity=1000)
+        for record in pool.map(_reparse_profile, profiles, chunksize=32):
+            results.append(record)
+        results.flush()
+
+        for target, usernames in pool.map(_reparse_modal, modals):
+            with open(f"{target}_usernames_reparsed.txt", "w") as f:
+                f.write("\n".join(usernames))
+            print(f"✓ {len(usernames)} usernames from {target}'s modal → {target}_usernames_reparsed.txt")
+
+    print(f"✓ Re-parsed in {time.perf_counter() - started:.1f}s → {output}")
+
+# ---------- BIO LINK ENRICHMENT ----------
+
+SOCIAL_PATTERNS = {
+    "instagram": re.compile(r'(?<![\w-])instagram\.com/([A-Za-z0-9._]{2,30})(?=[/?#"\'\s]|$)'),
+    "tiktok": re.compile(r'(?<![\w-])tiktok\.com/@([A-Za-z0-9._]{2,24})'),
+    "twitter": re.compile(r'(?<![\w-])(?:twitter|x)\.com/([A-Za-z0-9_]{1,15})(?=[/?#"\'\s]|$)'),
+    "youtube": re.compile(r'(?<![\w-])youtube\.com/(@[A-Za-z0-9._-]+|c/[A-Za-z0-9._-]+|channel/[A-Za-z0-9_-]+)'),
+    "linkedin": re.compile(r'(?<![\w-])linkedin\.com/in/([A-Za-z0-9_-]+)'),
+    "facebook": re.compile(r'(?<![\w-])facebook\.com/([A-Za-z0-9.]{5,50})(?=[/?#"\'\s]|$)'),
+}
+RESERVED_SOCIAL_PATHS = set(RESERVED_INSTAGRAM_PATHS) | {
+    'share', 'sharer', 'intent', 'home', 'login', 'signup', 'privacy', 'terms', 'policies', 'watch', 'embed'
+}
+
+def extract_contact_info(html_text):
+    """Emails and social handles found in a fetched page, as {"emails": [...], "socials": [...]}."""
+    import html as html_lib
+    text = html_lib.unescape(html_text)
+    emails = list(dict.fromkeys(
+        e for e in EMAIL_PATTERN.findall(text)
+        if not e.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp'))
+    ))
+    socials = []
+    for network, pattern in SOCIAL_PATTERNS.items():
+        for handle in pattern.findall(text):
+            if handle.lower() not in RESERVED_SOCIAL_PATHS:
+                socials.append(f"{network}:{handle}")
+    return {"emails": emails, "socials": list(dict.fromkeys(socials))}
+
+class BioLinkEnricher:
+    """
+    Fetches bio links on a private asyncio loop so the Instagram loop never
+    waits on them: submit() only schedules work. Uses one pooled aiohttp
+    session with global and per-host connection limits and a per-request
+    timeout. Parsed results are cached by URL on disk, and concurrent
+    requests for the same URL share one fetch.
+    """
+
+    def __init__(self, cache_path=None, concurrency=None, per_host=None, timeout=None):
+        import aiohttp
+        self._aiohttp = aiohttp
+        self.cache_path = cache_path or ENRICH_CACHE_FILE
+        self.cache = {}
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                self.cache = json.load(f)
+        self.results = {}
+        self._pending = []
+        self._inflight = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._session = asyncio.run_coroutine_threadsafe(self._open(
+            concurrency or ENRICH_CONCURRENCY, per_host or ENRICH_PER_HOST, timeout or ENRICH_TIMEOUT
+        ), self._loop).result()
+
+    async def _open(self, concurrency, per_host, timeout):
+        aiohttp = self._aiohttp
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=timeout),
+            headers={"User-Agent": _user_agent(), "Accept-Language": "en-US,en;q=0.9"},
+        )
+
+    def submit(self, username, bio_links):
+        urls = [url.strip() for url in (bio_links or "").split(",") if url.strip()]
+        if urls:
+            self._pending.append(asyncio.run_coroutine_threadsafe(self._enrich(username, urls), self._loop))
+
+    async def _enrich(self, username, urls):
+        emails, socials = [], []
+        for found in await asyncio.gather(*(self._fetch(url) for url in urls)):
+            emails += found["emails"]
+            socials += found["socials"]
+        self.results[username] = (list(dict.fromkeys(emails)), list(dict.fromkeys(socials)))
+
+    async def _fetch(self, url):
+        cached = self.cache.get(url)
+        if cached and time.time() - cached["fetched"] < ENRICH_CACHE_DAYS * 86400:
+            return cached
+        if url not in self._inflight:
+            self._inflight[url] = asyncio.ensure_future(self._download(url))
+        try:
+            found = await asyncio.shield(self._inflight[url])
+        finally:
+            self._inflight.pop(url, None)
+        if found is None:
+            return {"emails": [], "socials": []}
+        if not found.get("truncated"):
+            self.cache[url] = found
+        return found
+
+    async def _download(self, url):
+        try:
+            async with self._session.get(url, allow_redirects=True) as response:
+                if response.status >= 400:
+                    return {"emails": [], "socials": [], "fetched": time.time()}
+                # content.read(n) only returns what is already buffered; read chunks to EOF or the cap
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(65536):
+                    body += chunk
+                    if len(body) >= ENRICH_MAX_BYTES:
+                        break
+                truncated = len(body) >= ENRICH_MAX_BYTES and not response.content.at_eof()
+                html_text = bytes(body[:ENRICH_MAX_BYTES]).decode(response.charset or "utf-8", errors="replace")
+        except (self._aiohttp.ClientError, asyncio.TimeoutError, UnicodeError, LookupError) as e:
+            print(f"    ⚠️  Could not fetch {url}: {str(e) or type(e).__name__}")
+            return None
+        found = extract_contact_info(html_text)
+        found["fetched"] = time.time()
+        if truncated:
+            found["truncated"] = True
+        return found
+
+    def close(self, timeout=60):
+        """Wait up to `timeout` seconds for outstanding fetches, then save the cache and stop."""
+        deadline = time.monotonic() + timeout
+        for future in self._pending:
+            try:
+                future.result(timeout=max(deadline - time.monotonic(), 0))
+            except Exception:
+                future.cancel()
+        asyncio.run_coroutine_threadsafe(self._session.close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        with open(self.cache_path, "w") as f:
+            json.dump(self.cache, f)
+
+def enrich_csv(source, dest, enricher=None):
+    """
+    Copy `source` to `dest` with link_emails and link_socials columns. Rows the
+    enricher has not seen yet (e.g. from an earlier, resumed run) are fetched now.
+    """
+    if not os.path.exists(source):
+        print(f"No results at {source} to enrich")
+        return
+    own = enricher is None
+    enricher = enricher or BioLinkEnricher()
+    try:
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                if row["username"] not in enricher.results:
+                    enricher.submit(row["username"], row.get("bio_links"))
+    finally:
+        enricher.close()
+
+    with open(source, newline='', encoding='utf-8-sig') as src, \
+         open(dest, 'w', newline='', encoding='utf-8-sig') as out:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(out, fieldnames=list(reader.fieldnames) + ["link_emails", "link_socials"])
+        writer.writeheader()
+        enriched = 0
+        for row in reader:
+            emails, socials = enricher.results.get(row["username"], ([], []))
+            row["link_emails"] = ", ".join(emails)
+            row["link_socials"] = ", ".join(socials)
+            enriched += bool(emails or socials)
+            writer.writerow(row)
+    print(f"✓ Enriched {enriched} profiles from bio links → {dest}")
+
+# ---------- GRAPH CRAWL ----------
+
+def crawl_priority(record):
+    """Default crawl priority: expand accounts with more followers first."""
+    return record.followers or 0
+
+class CrawlGraph:
+    """
+    Disk-backed crawl state. Nodes (username, depth, priority, state) live in
+    SQLite, so the frontier is deduplicated by a UNIQUE index rather than a
+    Python set. Edges are appended to a flat file of little-endian uint32
+    (follower_id, followee_id) pairs. Node ids are the `nodes.id` column.
+    """
+
+    DISCOVERED, PROFILED, EXPANDED, FAILED = range(4)
+
+    def __init__(self, db_path=None, edges_path=None):
+        self.db = sqlite3.connect(db_path or CRAWL_DB)
+        self.edges_path = edges_path or CRAWL_EDGES
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS nodes (
+                id INTEGER PRIMARY KEY,
+                username TEXT NOT NULL UNIQUE,
+                depth INTEGER NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                state INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS nodes_frontier ON nodes (state, depth, priority DESC);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER);
+        """)
+        # Drop edges written after the last commit (e.g. a crash mid-expansion)
+        committed = self._meta("edge_bytes")
+        if os.path.exists(self.edges_path) and os.path.getsize(self.edges_path) > committed:
+            with open(self.edges_path, "r+b") as f:
+                f.truncate(committed)
+
+    def _meta(self, key, default=0):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+
+    def add_root(self, username):
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO nodes (username, depth) VALUES (?, 0)", (username,))
+
+    def next_task(self, max_depth):
+        """("profile" | "expand", id, username, depth) for the shallowest pending work, or None."""
+        profile = self.db.execute(
+            "SELECT id, username, depth FROM nodes WHERE state = ? ORDER BY depth, id LIMIT 1",
+            (self.DISCOVERED,)
+        ).fetchone()
+        expand = self.db.execute(
+            "SELECT id, username, depth FROM nodes WHERE state = ? AND depth < ? "
+            "ORDER BY depth, priority DESC LIMIT 1",
+            (self.PROFILED, max_depth)
+        ).fetchone()
+        # Profile a whole level before expanding it, so priorities are known
+        if profile and (not expand or profile[2] <= expand[2]):
+            return ("profile",) + profile
+        if expand:
+            return ("expand",) + expand
+        return None
+
+    def mark(self, node_id, state, priority=None):
+        with self.db:
+            if priority is None:
+                self.db.execute("UPDATE nodes SET state = ? WHERE id = ?", (state, node_id))
+            else:
+                self.db.execute("UPDATE nodes SET state = ?, priority = ? WHERE id = ?",
+                                (state, priority, node_id))
+
+    def expand(self, node_id, depth, followees):
+        """Record `node_id -> followees` edges, queue unseen followees, and mark the node expanded."""
+        with self.db:
+            self.db.executemany("INSERT OR IGNORE INTO nodes (username, depth) VALUES (?, ?)",
+                                ((username, depth + 1) for username in followees))
+            pairs = array('I')
+            for username in followees:
+                (followee_id,) = self.db.execute("SELECT id FROM nodes WHERE username = ?", (username,)).fetchone()
+                pairs.extend((node_id, followee_id))
+            if sys.byteorder != "little":
+                pairs.byteswap()
+            with open(self.edges_path, "ab") as f:
+                pairs.tofile(f)
+            self._set_meta("edge_bytes", os.path.getsize(self.edges_path))
+            self.db.execute("UPDATE nodes SET state = ? WHERE id = ?", (self.EXPANDED, node_id))
+
+    def add_page_loads(self, count):
+        with self.db:
+            self._set_meta("page_loads", self._meta("page_loads") + count)
+
+    def stats(self):
+        nodes = self.db.execute("SELECT COUNT(*) FROM nodes").fetchone()[0]
+        expanded = self.db.execute("SELECT COUNT(*) FROM nodes WHERE state = ?", (self.EXPANDED,)).fetchone()[0]
+        edges = self._meta("edge_bytes") // 8
+        return {"nodes": nodes, "expanded": expanded, "edges": edges, "page_loads": self._meta("page_loads")}
+
+    def close(self):
+        self.db.close()
+
+def read_crawl_edges(path=None):
+    """Yield (follower_id, followee_id) pairs from a crawl edge file."""
+    with open(path or CRAWL_EDGES, "rb") as f:
+        while True:
+            chunk = f.read(8 * 65536)
+            if not chunk:
+                return
+            pairs = array('I')
+            pairs.frombytes(chunk)
+            if sys.byteorder != "little":
+                pairs.byteswap()
+            for i in range(0, len(pairs), 2):
+                yield pairs[i], pairs[i + 1]
+
+def crawl(browser, root=None, max_depth=None, max_page_loads=None, priority=None):
+    """
+    Breadth-first crawl over following lists starting at `root`. Every node is
+    profiled (one page load) and nodes above `max_depth` are expanded through
+    their following modal (one page load plus scrolling), highest priority
+    first within each depth. Stops when the frontier is empty or the page-load
+    budget (counted across resumed runs) is spent.
+    """
+    root = root or TARGET_ACCOUNT
+    max_depth = CRAWL_DEPTH if max_depth is None else max_depth
+    max_page_loads = max_page_loads or CRAWL_MAX_PAGE_LOADS
+    priority = priority or crawl_priority
+
+    graph = CrawlGraph()
+    results = ResultBuffer(CRAWL_OUTPUT_CSV, append=True)
+    snapshots = SnapshotStore() if SNAPSHOT_DB else None
+    graph.add_root(root)
+
+    try:
+        while True:
+            stats = graph.stats()
+            if stats["page_loads"] >= max_page_loads:
+                print(f"✓ Page-load budget of {max_page_loads} reached")
+                break
+            task = graph.next_task(max_depth)
+            if task is None:
+                print("✓ Frontier exhausted")
+                break
+
+            kind, node_id, username, depth = task
+            print(f"[depth {depth} | {stats['nodes']} nodes | {stats['edges']} edges | "
+                  f"{stats['page_loads']}/{max_page_loads} loads] {kind} {username}")
+
+            if kind == "profile":
+                record = scrape_profile(browser, username)
+                graph.add_page_loads(1)
+                results.append(record)
+                if snapshots and record.has_data():
+                    snapshots.append(record)
+                graph.mark(node_id, CrawlGraph.PROFILED, priority(record))
+                continue
+
+            modal = open_following_modal(browser, username)
+            graph.add_page_loads(1)
+            if modal is None:
+                graph.mark(node_id, CrawlGraph.FAILED)
+                continue
+            journal = UsernameJournal(f"{CRAWL_DB}.{username}.partial")
+            followees = collect_usernames_from_modal(
+                browser, modal, max_count=MAX_FOLLOWEES_TO_COLLECT, journal=journal,
+                target=username, output_file=None
+            )
+            graph.expand(node_id, depth, followees)
+            try:
+                browser.press(browser.query("//body"), "Escape")
+            except Exception:
+                pass
+    finally:
+        results.flush()
+        stats = graph.stats()
+        print(f"Crawl state: {stats['nodes']} nodes, {stats['expanded']} expanded, "
+              f"{stats['edges']} edges, {stats['page_loads']} page loads")
+        print(f"Profiles → {CRAWL_OUTPUT_CSV} | edges → {CRAWL_EDGES} | node ids → {CRAWL_DB}")
+        graph.close()
+        if snapshots:
+            snapshots.close()
+
+def crawl_main():
+    browser = None
+    remaining = cooldown_remaining(INSTAGRAM_USERNAME)
+    if remaining:
+        print(f"✗ {INSTAGRAM_USERNAME} is cooling down after an Instagram challenge - "
+              f"try again in {remaining / 60:.0f} min")
+        return
+    try:
+        browser = open_backend()
+        if not login_instagram(browser, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
+            print("Exiting due to login failure")
+            return
+        report_first_load(browser)
+        crawl(browser)
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user! Crawl state is saved - run the crawl again to resume.")
+    except AccountChallenged as e:
+        start_cooldown(INSTAGRAM_USERNAME)
+        print(f"\n\n✗ Instagram challenged {INSTAGRAM_USERNAME} ({e}). Crawl state is saved; "
+              f"resume after the {ACCOUNT_COOLDOWN_MINUTES} min cool-down.")
+    finally:
+        if browser:
+            browser.quit()
+            print("Browser closed")
 
 # ---------- MAIN ----------
 
 def main():
-    driver = None
-    results = []
+    browser = None
+    results = None
+    snapshots = SnapshotStore() if SNAPSHOT_DB else None
+    enricher = BioLinkEnricher() if ENRICH_BIO_LINKS else None
     processed_usernames = []
+    stats = AccountStats(INSTAGRAM_USERNAME)
+    
+    remaining = cooldown_remaining(INSTAGRAM_USERNAME)
+    if remaining:
+        print(f"✗ {INSTAGRAM_USERNAME} is cooling down after an Instagram challenge - "
+              f"try again in {remaining / 60:.0f} min")
+        return
     
     try:
         checkpoint = load_checkpoint()
@@ -815,13 +2423,12 @@ def main():
                 processed_usernames = checkpoint['processed']
                 print(f"Resuming: {len(processed_usernames)}/{len(usernames_to_scrape)} already processed")
                 
-                if os.path.exists(OUTPUT_CSV):
-                    existing_df = pd.read_csv(OUTPUT_CSV)
-                    results = existing_df.to_dict('records')
+                results = ResultBuffer(OUTPUT_CSV, append=True)
                 
-                driver = start_driver()
-                if not login_instagram(driver, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
+                browser = open_backend()
+                if not login_instagram(browser, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
                     return
+                report_first_load(browser)
                 
                 usernames_to_scrape = [u for u in usernames_to_scrape if u not in processed_usernames]
                 
@@ -829,49 +2436,73 @@ def main():
                 checkpoint = None
         
         if not checkpoint:
-            driver = start_driver()
+            browser = open_backend()
             
-            if not login_instagram(driver, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
+            if not login_instagram(browser, INSTAGRAM_USERNAME, INSTAGRAM_PASSWORD):
                 print("Exiting due to login failure")
                 return
+            report_first_load(browser)
+            
+            journal = UsernameJournal(USERNAMES_JOURNAL)
+            if journal.recovered:
+                print(f"✓ Recovered {len(journal.recovered)} usernames from an interrupted collection")
             
-            modal = open_following_modal(driver, TARGET_ACCOUNT)
-            if not modal:
+            modal = open_following_modal(browser, TARGET_ACCOUNT)
+            if modal is None:
+                journal.close()
                 print("Exiting: Could not open following modal")
                 return
             
             usernames_to_scrape = collect_usernames_from_modal(
-                driver, modal, max_count=MAX_FOLLOWEES_TO_COLLECT
+                browser, modal, max_count=MAX_FOLLOWEES_TO_COLLECT, journal=journal
             )
             
             if not usernames_to_scrape:
                 print("No usernames collected")
                 return
             
+            # From here on the profile checkpoint takes over from the journal
+            checkpoint = {'usernames': usernames_to_scrape}
+            save_checkpoint(usernames_to_scrape, processed_usernames)
+            
             # Close modal
             try:
-                driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+                browser.press(browser.query("//body"), "Escape")
                 rand_sleep(1, 2)
             except:
                 pass
         
+        if results is None:
+            results = ResultBuffer(OUTPUT_CSV)
+        
         # Scrape profiles
         total = len(usernames_to_scrape)
         print(f"\n{'='*50}")
         print(f"Starting to scrape {total} profiles...")
         print(f"{'='*50}\n")
         
-        for i, username in enumerate(usernames_to_scrape, 1):
-            print(f"[{i}/{total}] Scraping {username}...")
-            
+        stats.start()
+        if PIPELINE_TABS > 1:
+            profiles = scrape_profiles_pipelined(browser, usernames_to_scrape, tabs=PIPELINE_TABS)
+        else:
+            profiles = scrape_profiles_sequential(browser, usernames_to_scrape)
+        
+        for i, (username, profile_data) in enumerate(profiles, 1):
             try:
-                profile_data = scrape_profile(driver, username)
                 if profile_data:
                     results.append(profile_data)
                     processed_usernames.append(username)
+                    if profile_data.has_data():
+                        stats.profiles += 1
+                        if snapshots:
+                            snapshots.append(profile_data)
+                    elif snapshots:
+                        print(f"  ⚠ Nothing extracted for {username}; not added to history")
+                    if enricher:
+                        enricher.submit(username, profile_data.bio_links)
                 
                 if i % SAVE_FREQUENCY == 0:
-                    save_results(results, OUTPUT_CSV)
+                    results.flush()
                     if not checkpoint:
                         checkpoint = {'usernames': usernames_to_scrape}
                     save_checkpoint(
@@ -879,26 +2510,35 @@ def main():
                         processed_usernames
                     )
                 
-                rand_sleep()
-                
             except Exception as e:
                 print(f"  ✗ Exception for {username}: {e}")
                 continue
         
-        save_results(results, OUTPUT_CSV)
+        results.flush()
+        
+        if enricher:
+            enrich_csv(OUTPUT_CSV, ENRICH_OUTPUT_CSV, enricher)
+            enricher = None
         
         if os.path.exists(CHECKPOINT_FILE):
             os.remove(CHECKPOINT_FILE)
             print("✓ Checkpoint cleaned up")
         
         print(f"\n{'='*50}")
-        print(f"COMPLETED! Scraped {len(results)} profiles")
+        print(f"COMPLETED! Scraped {results.total} profiles")
         print(f"Results saved to: {OUTPUT_CSV}")
         print(f"{'='*50}")
         
-    except KeyboardInterrupt:
-        print("\n\nInterrupted by user!")
-        save_results(results, OUTPUT_CSV)
+    except (KeyboardInterrupt, AccountChallenged) as e:
+        if isinstance(e, AccountChallenged):
+            stats.challenged = True
+            start_cooldown(INSTAGRAM_USERNAME)
+            print(f"\n\n✗ Instagram challenged {INSTAGRAM_USERNAME} ({e}).")
+            print(f"  Stopping; resume after the {ACCOUNT_COOLDOWN_MINUTES} min cool-down.")
+        else:
+            print("\n\nInterrupted by user!")
+        if results:
+            results.flush()
         if 'usernames_to_scrape' in locals():
             if not checkpoint:
                 checkpoint = {'usernames': usernames_to_scrape}
@@ -908,12 +2548,152 @@ def main():
         print(f"\n\nFatal error: {e}")
         import traceback
         traceback.print_exc()
-        save_results(results, OUTPUT_CSV)
+        if results:
+            results.flush()
         
     finally:
-        if driver:
-            driver.quit()
-            print("Driver closed")
+        print("Run report:")
+        stats.report()
+        if snapshots:
+            snapshots.close()
+        if enricher:
+            enricher.close(timeout=10)
+        if browser:
+            browser.quit()
+            print("Browser closed")
+
+SELFTEST_PROFILE = """<html><head>
+<meta property="og:description" content="1,234 Followers, 10 Following, 56 Posts - See Instagram photos">
+</head><body><main><header><section>
+<h2><span>{username}</span></h2>
+<div><span>Jane Doe</span></div>
+<div><span>Chef and founder - bookings: jane@example.com</span></div>
+<svg aria-label="Verified"></svg>
+<a href="https://linktr.ee/{username}">linktr.ee/{username}</a>
+<ul><li><span>56</span> posts</li>
+<li><a href="/{username}/followers/"><span>1,234</span> followers</a></li>
+<li><a href="/{username}/following/"><span>10</span> following</a></li></ul>
+</section></header></main></body></html>"""
+
+SELFTEST_MODAL = """<html><body><main><header></header></main>
+<div role="dialog"><div style="overflow-y: auto">
+<a href="/alice/">alice</a><a href="/bob_99/">bob_99</a><a href="/explore/">Explore</a><a href="/{target}/">{target}</a>
+</div></div></body></html>"""
+
+def self_test():
+    """Run login, modal collection and profile extraction against FakeBackend fixtures (needs lxml)."""
+    global PACING
+    base = "https://www.instagram.com/"
+    browser = FakeBackend({
+        f"{base}accounts/login/": '<html><body><button>Allow all cookies</button><form action="/">'
+                                  '<input name="username"><input name="password"></form></body></html>',
+        base: "<html><body><button>Not Now</button></body></html>",
+        f"{base}jane/": SELFTEST_PROFILE.format(username="jane"),
+        f"{base}jane/following/": SELFTEST_MODAL.format(target="jane"),
+    })
+    saved_pacing, PACING = PACING, PacingPolicy((0, 0))
+    try:
+        assert login_instagram(browser, "me", "pw"), "login failed"
+        modal = open_following_modal(browser, "jane")
+        assert modal is not None, "following modal not opened"
+        usernames = collect_usernames_from_modal(browser, modal, max_count=2, target="jane", output_file=None)
+        assert usernames == ["alice", "bob_99"], usernames
+        record = scrape_profile(browser, "jane")
+    finally:
+        PACING = saved_pacing
+    expected = {"name": "Jane Doe", "followers": 1234, "posts": 56, "email": "jane@example.com",
+                "verified": True, "bio_links": "https://linktr.ee/jane"}
+    for field, value in expected.items():
+        assert getattr(record, field) == value, f"{field}: {getattr(record, field)!r} != {value!r}"
+    print("✓ Self-test passed")
+
+def bench_memory(rows=100_000):
+    """
+    Compare the old result handling (list of dicts, DataFrame rebuilt on every
+    save) with ProfileRecord + ResultBuffer on synthetic profiles.
+    """
+    import io
+    import tracemalloc
+    import tempfile
+    from contextlib import redirect_stdout
+    import pandas as pd
+
+    def make(i):
+        return (f"user{i}", f"Name {i}", 1000 + i, i % 500,
+                f"Bio number {i} - contact user{i}@example.com", f"user{i}@example.com",
+                i % 7 == 0, profile_url(f"user{i}"), f"https://linktr.ee/user{i}")
+
+    def held(build):
+        tracemalloc.start()
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return kept, current
+
+    dicts, dict_bytes = held(lambda: [
+        {"username": u, "name": n, "followers": str(f), "posts": str(p), "bio": b,
+         "email": e, "verified": "Yes" if v else "No", "profile_link": l, "bio_links": bl}
+        for u, n, f, p, b, e, v, l, bl in map(make, range(rows))
+    ])
+    records, record_bytes = held(lambda: [ProfileRecord(*make(i)) for i in range(rows)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        pd.DataFrame(dicts).to_csv(os.path.join(tmp, "old.csv"), index=False, encoding='utf-8-sig')
+        old_save = time.perf_counter() - started
+
+        buffer = ResultBuffer(os.path.join(tmp, "new.csv"), capacity=SAVE_FREQUENCY)
+        tracemalloc.start()
+        started = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            for record in records:
+                buffer.append(record)
+            buffer.flush()
+        new_total = time.perf_counter() - started
+        _, buffer_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    saves = max(rows // SAVE_FREQUENCY, 1)
+    print(f"{rows} profiles, save every {SAVE_FREQUENCY}:")
+    print(f"  dict rows held in memory:    {dict_bytes / rows:8.0f} B/row")
+    print(f"  ProfileRecord rows:          {record_bytes / rows:8.0f} B/row")
+    print(f"  ResultBuffer peak (streamed): {buffer_peak / 1024:7.0f} KiB total")
+    print(f"  DataFrame save of full list: {old_save * 1000:8.1f} ms (repeated on each of ~{saves} saves)")
+    print(f"  ResultBuffer chunk flush:    {new_total / saves * 1000:8.3f} ms per save")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Instagram followees scraper")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="scrape TARGET_ACCOUNT's followees (default)")
+    commands.add_parser("crawl", help="breadth-first crawl of following lists up to CRAWL_DEPTH")
+    commands.add_parser("selftest", help="check login, modal and profile parsing against built-in HTML fixtures")
+    bench = commands.add_parser("bench-memory", help="compare per-row memory and save cost of result storage")
+    bench.add_argument("--rows", type=int, default=100_000)
+    history = commands.add_parser("history", help="show latest snapshot per username, or one username's series")
+    history.add_argument("username", nargs="?")
+    history.add_argument("--db", default=SNAPSHOT_DB or "snapshots.sqlite")
+    enrich = commands.add_parser("enrich", help="fetch bio links of an output CSV and add link_emails/link_socials")
+    enrich.add_argument("--input", default=OUTPUT_CSV)
+    enrich.add_argument("--output", default=ENRICH_OUTPUT_CSV)
+    reparse = commands.add_parser("reparse", help="re-run extraction over ARCHIVE_DIR in parallel, without a browser")
+    reparse.add_argument("--archive", default=ARCHIVE_DIR)
+    reparse.add_argument("--output")
+    reparse.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.command == "crawl":
+        crawl_main()
+    elif args.command == "selftest":
+        self_test()
+    elif args.command == "bench-memory":
+        bench_memory(args.rows)
+    elif args.command == "history":
+        show_history(args.username, args.db)
+    elif args.command == "enrich":
+        enrich_csv(args.input, args.output)
+    elif args.command == "reparse":
+        reparse_archive(args.archive, args.output, args.workers)
+    else:
+        main()
\ No newline at end of file